@@ -0,0 +1,272 @@
+"""
+Admission control for write endpoints
+
+Every write route gets a token bucket per client, and runs in a lane with a
+fixed number of concurrent slots so a burst of writes can never take all of
+the database connections. Requests over their rate get a 429, requests that
+cannot get a slot within the queue timeout get a 503, both with Retry-After.
+Excel uploads run in their own lane so they cannot starve quiz submissions.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, str(default)))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Lane:
+    """A bounded pool of concurrent slots with a bounded wait queue"""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+
+class RoutePolicy:
+    """Rate limit and lane for one write route. A rate of 0 or below disables rate limiting"""
+
+    def __init__(self, lane: str, rate: float, burst: float):
+        if rate > 0 and burst < 1:
+            raise ValueError(f"Burst for a rate-limited route must be at least 1, got {burst}")
+        self.lane = lane
+        self.rate = rate
+        self.burst = burst
+        self.allowed = 0
+        self.rate_limited = 0
+
+
+class AdmissionController:
+    MAX_BUCKETS = 10000
+
+    def __init__(self, lanes: Dict[str, Lane], policies: Dict[Tuple[str, str], RoutePolicy],
+                 trusted_proxy_hops: int = 0):
+        self.lanes = lanes
+        self.policies = policies
+        self.trusted_proxy_hops = trusted_proxy_hops
+        # LRU order: least recently seen client first, so eviction is O(1)
+        self._buckets: "OrderedDict[Tuple[str, str, str], TokenBucket]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls):
+        lanes = {
+            "write": Lane(
+                "write",
+                concurrency=_env_int("ADMISSION_WRITE_CONCURRENCY", 8),
+                max_queue=_env_int("ADMISSION_WRITE_QUEUE", 32),
+                queue_timeout=_env_float("ADMISSION_WRITE_QUEUE_TIMEOUT", 2),
+            ),
+            "upload": Lane(
+                "upload",
+                concurrency=_env_int("ADMISSION_UPLOAD_CONCURRENCY", 2),
+                max_queue=_env_int("ADMISSION_UPLOAD_QUEUE", 4),
+                queue_timeout=_env_float("ADMISSION_UPLOAD_QUEUE_TIMEOUT", 10),
+            ),
+            # Open live quiz sessions (see quiz_sessions.py); never queued
+            "session": Lane(
+                "session",
+                concurrency=_env_int("QUIZ_SESSION_MAX", 200),
+                max_queue=0,
+                queue_timeout=0,
+            ),
+        }
+        policies = {
+            ("POST", "/api/submissions/"): RoutePolicy(
+                "write",
+                rate=_env_float("RATE_LIMIT_SUBMISSIONS_PER_SEC", 5),
+                burst=_env_float("RATE_LIMIT_SUBMISSIONS_BURST", 20),
+            ),
+            ("POST", "/api/init-data/"): RoutePolicy(
+                "write",
+                rate=_env_float("RATE_LIMIT_INIT_DATA_PER_SEC", 0.2),
+                burst=_env_float("RATE_LIMIT_INIT_DATA_BURST", 2),
+            ),
+            ("POST", "/api/upload-quizzes/"): RoutePolicy(
+                "upload",
+                rate=_env_float("RATE_LIMIT_UPLOADS_PER_SEC", 0.1),
+                burst=_env_float("RATE_LIMIT_UPLOADS_BURST", 3),
+            ),
+            # Checked by quiz_sessions.py, the middleware only handles HTTP
+            ("WEBSOCKET", "/ws/quiz/{topic_id}"): RoutePolicy(
+                "session",
+                rate=_env_float("RATE_LIMIT_QUIZ_SESSIONS_PER_SEC", 0.5),
+                burst=_env_float("RATE_LIMIT_QUIZ_SESSIONS_BURST", 5),
+            ),
+        }
+        return cls(lanes, policies, _env_int("TRUSTED_PROXY_HOPS", 0))
+
+    def client_key(self, scope) -> str:
+        if self.trusted_proxy_hops > 0:
+            # Each proxy appends the address it received the request from, so only
+            # the entries added by our own proxies can be trusted: the client is the
+            # entry written by the outermost trusted proxy, counted from the right.
+            forwarded = []
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    forwarded += [entry.strip() for entry in value.decode("latin-1").split(",")]
+            if len(forwarded) >= self.trusted_proxy_hops:
+                return forwarded[-self.trusted_proxy_hops]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def check_rate(self, method: str, path: str, policy: RoutePolicy, client: str) -> float:
+        """Returns 0 if the client may proceed, otherwise the Retry-After delay in seconds"""
+        if policy.rate <= 0:
+            policy.allowed += 1
+            return 0.0
+        now = time.monotonic()
+        key = (client, method, path)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = TokenBucket(policy.rate, policy.burst)
+        else:
+            self._buckets.move_to_end(key)
+
+        wait = bucket.take(now)
+        if wait:
+            policy.rate_limited += 1
+        else:
+            policy.allowed += 1
+        return wait
+
+    def stats(self) -> dict:
+        return {
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+            "routes": {
+                f"{method} {path}": {
+                    "lane": policy.lane,
+                    "rate_per_sec": policy.rate,
+                    "burst": policy.burst,
+                    "allowed": policy.allowed,
+                    "rate_limited": policy.rate_limited,
+                }
+                for (method, path), policy in self.policies.items()
+            },
+            "tracked_clients": len(self._buckets),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to incoming HTTP requests"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        policy: Optional[RoutePolicy] = self.controller.policies.get((method, path))
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.controller.check_rate(method, path, policy, self.controller.client_key(scope))
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests, please slow down"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        lane = self.controller.lanes[policy.lane]
+        if not await lane.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(lane.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+
+controller = AdmissionController.from_env()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+PySQL Gym Hot-Path Query Benchmark
+Measures the per-call cost of get_quiz, get_topic and get_quizzes_by_topic
+with the original db.query(...).filter(...) form, with cached lambda
+statements, and with server-side prepared statements (see queries.py).
+
+Needs a populated database, e.g. from `python generate_data.py`.
+
+Usage:
+    python bench_queries.py [--calls 5000] [--seed 42]
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import select
+
+import models
+import queries
+from database import SessionLocal
+
+
+def legacy_get_topic(db, topic_id):
+    return db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+
+
+def legacy_get_quiz(db, quiz_id):
+    return db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+
+
+def legacy_get_quizzes_by_topic(db, topic_id):
+    return db.query(models.Quiz).filter(models.Quiz.topic_id == topic_id).all()
+
+
+VARIANTS = {
+    "get_topic": [
+        ("db.query", legacy_get_topic),
+        ("lambda_stmt", queries.get_topic_cached),
+        ("prepared", queries.get_topic_prepared),
+    ],
+    "get_quiz": [
+        ("db.query", legacy_get_quiz),
+        ("lambda_stmt", queries.get_quiz_cached),
+        ("prepared", queries.get_quiz_prepared),
+    ],
+    "get_quizzes_by_topic": [
+        ("db.query", legacy_get_quizzes_by_topic),
+        ("lambda_stmt", queries.get_quizzes_by_topic_cached),
+        ("prepared", queries.get_quizzes_by_topic_prepared),
+    ],
+}
+
+
+def sample_ids(db, column, count, rng):
+    ids = db.execute(select(column).distinct().limit(10000)).scalars().all()
+    if not ids:
+        return []
+    return [rng.choice(ids) for _ in range(count)]
+
+
+def time_calls(func, ids, warmup):
+    db = SessionLocal()
+    try:
+        for value in ids[:warmup]:
+            func(db, value)
+            db.expunge_all()
+        started = time.perf_counter()
+        for value in ids:
+            func(db, value)
+            db.expunge_all()
+        elapsed = time.perf_counter() - started
+    finally:
+        db.rollback()
+        db.close()
+    return elapsed / len(ids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot-path CRUD queries")
+    parser.add_argument("--calls", type=int, default=5000, help="Timed calls per variant")
+    parser.add_argument("--warmup", type=int, default=200, help="Untimed calls per variant")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        topic_ids = sample_ids(db, models.Quiz.topic_id, args.calls, rng)
+        quiz_ids = sample_ids(db, models.Quiz.id, args.calls, rng)
+    finally:
+        db.close()
+
+    if not quiz_ids:
+        print("❌ No quizzes found. Populate the database first (python generate_data.py).")
+        return
+
+    lookup_ids = {
+        "get_topic": topic_ids,
+        "get_quiz": quiz_ids,
+        "get_quizzes_by_topic": topic_ids,
+    }
+
+    print(f"{'query':<24}{'variant':<14}{'µs/call':>10}{'vs db.query':>14}")
+    for name, variants in VARIANTS.items():
+        baseline = None
+        for label, func in variants:
+            per_call = time_calls(func, lookup_ids[name], args.warmup)
+            baseline = baseline or per_call
+            print(f"{name:<24}{label:<14}{per_call:>10.1f}{baseline / per_call:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
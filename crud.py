@@ -1,6 +1,8 @@
 # crud.py
-from sqlalchemy.orm import Session
-import models, schemas
+from sqlalchemy import Float, and_, cast, func, or_
+from sqlalchemy.orm import Session, joinedload
+import models, schemas, queries
+import re
 
 # Topics
 def create_topic(db: Session, topic: schemas.TopicCreate):
@@ -14,7 +16,7 @@ def get_topics(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Topic).offset(skip).limit(limit).all()
 
 def get_topic(db: Session, topic_id: int):
-    return db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+    return queries.get_topic(db, topic_id)
 
 # Quizzes
 def create_quiz(db: Session, quiz: schemas.QuizCreate):
@@ -22,7 +24,7 @@ def create_quiz(db: Session, quiz: schemas.QuizCreate):
         topic_id=quiz.topic_id,
         question=quiz.question,
         choices=quiz.choices,
-        correct_answer=quiz.correct_answer
+        correct_index=quiz.correct_index
     )
     db.add(db_quiz)
     db.commit()
@@ -30,22 +32,72 @@ def create_quiz(db: Session, quiz: schemas.QuizCreate):
     return db_quiz
 
 def get_quizzes_by_topic(db: Session, topic_id: int):
-    return db.query(models.Quiz).filter(models.Quiz.topic_id == topic_id).all()
+    return queries.get_quizzes_by_topic(db, topic_id)
 
 def get_quiz(db: Session, quiz_id: int):
-    return db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+    return queries.get_quiz(db, quiz_id)
+
+# Shorter prefixes (e.g. "a:*") match most of the bank and force ranking every row
+MIN_SEARCH_WORD_LENGTH = 3
+
+def build_prefix_tsquery(terms: str):
+    """Turn free text into a tsquery string where every word is a prefix match"""
+    words = [word for word in re.findall(r"[^\W_]+", terms.lower()) if len(word) >= MIN_SEARCH_WORD_LENGTH]
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+def search_quizzes(db: Session, q: str, topic_id: int = None, limit: int = 20,
+                   after_rank: float = None, after_id: int = None):
+    """
+    Full-text search over quiz questions and choices.
+
+    Returns (quiz, rank) pairs ordered by rank (best first), then id. Pass the
+    rank and id of the last row as after_rank/after_id to fetch the next page.
+    Words shorter than MIN_SEARCH_WORD_LENGTH are ignored; raises ValueError
+    if none are left.
+    """
+    tsquery_text = build_prefix_tsquery(q)
+    if tsquery_text is None:
+        raise ValueError(f"Search needs at least one word of {MIN_SEARCH_WORD_LENGTH} or more characters")
+
+    tsquery = func.to_tsquery("english", tsquery_text)
+    # ts_rank_cd returns real; work in double precision so the rank sent back
+    # in a cursor compares exactly (real vs numeric widens only one side)
+    rank = cast(func.ts_rank_cd(models.Quiz.search_vector, tsquery), Float(53))
+
+    query = db.query(models.Quiz, rank.label("rank")).filter(
+        models.Quiz.search_vector.op("@@")(tsquery)
+    )
+    if topic_id is not None:
+        query = query.filter(models.Quiz.topic_id == topic_id)
+    if after_rank is not None and after_id is not None:
+        after_rank = cast(after_rank, Float(53))
+        query = query.filter(or_(
+            rank < after_rank,
+            and_(rank == after_rank, models.Quiz.id > after_id),
+        ))
+
+    return query.order_by(rank.desc(), models.Quiz.id).limit(limit).all()
 
 # Submissions
 def create_submission(db: Session, submission: schemas.SubmissionCreate):
     quiz = get_quiz(db, submission.quiz_id)
     if not quiz:
         return None
-    is_correct = (submission.selected == quiz.correct_answer)
+    selected_index = submission.selected_index
+    if selected_index is None:
+        # Legacy text answers that aren't one of the choices are stored as wrong
+        if submission.selected in quiz.choices:
+            selected_index = quiz.choices.index(submission.selected)
+    elif not 0 <= selected_index < len(quiz.choices):
+        raise ValueError("selected_index must be the position of one of the choices")
+    is_correct = (selected_index == quiz.correct_index)
     score = 1 if is_correct else 0
     db_sub = models.Submission(
         quiz_id=submission.quiz_id,
         user_name=submission.user_name,
-        selected=submission.selected,
+        selected_index=selected_index,
         is_correct=is_correct,
         score=score
     )
@@ -54,8 +106,32 @@ def create_submission(db: Session, submission: schemas.SubmissionCreate):
     db.refresh(db_sub)
     return db_sub
 
+def create_bulk_submissions(db: Session, user_name: str, answers: list[dict]):
+    """Store already graded answers (quiz_id, selected_index, is_correct) in one commit"""
+    db_subs = [
+        models.Submission(
+            quiz_id=answer["quiz_id"],
+            user_name=user_name,
+            selected_index=answer["selected_index"],
+            is_correct=answer["is_correct"],
+            score=1 if answer["is_correct"] else 0
+        )
+        for answer in answers
+    ]
+    db.add_all(db_subs)
+    db.commit()
+    return db_subs
+
 def get_submissions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Submission).offset(skip).limit(limit).all()
+    # Newest first, so only the most recent monthly partitions are scanned
+    return (
+        db.query(models.Submission)
+        .options(joinedload(models.Submission.quiz))
+        .order_by(models.Submission.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
 def create_bulk_quizzes(db: Session, quizzes: list[schemas.QuizCreate]):
     """Create multiple quizzes in bulk"""
@@ -65,7 +141,7 @@ def create_bulk_quizzes(db: Session, quizzes: list[schemas.QuizCreate]):
             topic_id=quiz.topic_id,
             question=quiz.question,
             choices=quiz.choices,
-            correct_answer=quiz.correct_answer
+            correct_index=quiz.correct_index
         )
         db.add(db_quiz)
         created_quizzes.append(db_quiz)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+PySQL Gym Synthetic Data Generator
+Builds a large, realistic dataset for scale testing: thousands of topics,
+millions of quizzes and tens of millions of submissions. Quiz popularity and
+user activity follow a Zipf-like distribution, so a few users and quizzes
+account for most of the submissions, like in production.
+
+Rows are streamed into PostgreSQL with COPY in batches. The output depends
+only on the command-line arguments (--end-date defaults to a fixed date, not
+today), so the same command always builds the same dataset.
+
+Usage:
+    python generate_data.py --truncate
+    python generate_data.py --seed 7 --topics 5000 --quizzes 2000000 --submissions 30000000 --truncate
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import text
+
+import models
+import partitions
+from database import engine
+
+SUBJECTS = [
+    "Python", "SQL", "PostgreSQL", "Pandas", "NumPy", "FastAPI", "Django",
+    "Flask", "SQLAlchemy", "Git", "Linux", "Docker", "Regex", "Algorithms",
+    "Data Structures", "Testing", "Asyncio", "Networking", "Security", "Statistics",
+]
+
+LEVELS = ["Basics", "Fundamentals", "Intermediate", "Advanced", "Internals", "Best Practices", "Performance"]
+
+CONCEPTS = [
+    "list comprehension", "generator", "decorator", "context manager", "index",
+    "join", "subquery", "window function", "transaction", "isolation level",
+    "primary key", "foreign key", "dictionary", "tuple", "closure", "iterator",
+    "exception", "virtual environment", "partition", "query planner", "vacuum",
+    "connection pool", "coroutine", "event loop", "migration", "constraint",
+    "aggregate", "group by", "having clause", "common table expression",
+]
+
+QUESTION_TEMPLATES = [
+    "What is the main purpose of a {concept} in {subject}?",
+    "Which statement about a {concept} in {subject} is true?",
+    "When should you avoid using a {concept} in {subject}?",
+    "How does {subject} evaluate a {concept}?",
+    "What happens if a {concept} fails in {subject}?",
+]
+
+CHOICE_TEMPLATES = [
+    "It improves {concept} performance",
+    "It is required by every {concept}",
+    "It replaces the {concept} entirely",
+    "It only works with a {concept} at runtime",
+    "It has no effect on the {concept}",
+    "It must be declared before the {concept}",
+]
+
+COPY_BATCH_SIZE = 100000
+
+# Fixed so the default dataset doesn't change from day to day
+DEFAULT_END_DATE = date(2026, 6, 30)
+
+# Submissions draw their quiz and user in chunks of this many rows. Fixed, so
+# the generated data does not depend on --batch-size
+SAMPLE_CHUNK_SIZE = 10000
+
+
+def print_banner():
+    """Print the generator banner"""
+    print("""
+🧪 PySQL Gym - Synthetic Data Generator
+========================================
+""")
+
+
+def zipf_cum_weights(count, skew):
+    """Cumulative weights where the item at rank r has weight 1 / r**skew"""
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def copy_rows(connection, table, columns, rows, batch_size=COPY_BATCH_SIZE):
+    """Stream rows into table with COPY ... FROM STDIN, batch_size rows at a time"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.cursor()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    total = 0
+    pending = 0
+
+    def flush():
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending == batch_size:
+            flush()
+            total += pending
+            pending = 0
+            print(f"   {table}: {total:,} rows", end="\r")
+
+    if pending:
+        flush()
+        total += pending
+    cursor.close()
+    print(f"✅ {table}: {total:,} rows        ")
+    return total
+
+
+def generate_topics(rng, count):
+    for topic_id in range(1, count + 1):
+        subject = rng.choice(SUBJECTS)
+        level = rng.choice(LEVELS)
+        title = f"{subject} {level} #{topic_id}"
+        description = f"Practice {subject.lower()} {level.lower()} with {rng.randint(5, 500)} hand-picked questions"
+        yield (topic_id, title, description)
+
+
+def generate_quizzes(rng, count, topic_count, skew, answer_key):
+    """Yield quiz rows, recording (choice count, correct index) per quiz in answer_key"""
+    # A few topics hold most of the questions
+    topic_ids = list(range(1, topic_count + 1))
+    rng.shuffle(topic_ids)
+    topic_weights = zipf_cum_weights(topic_count, skew)
+
+    for quiz_id in range(1, count + 1):
+        topic_id = rng.choices(topic_ids, cum_weights=topic_weights)[0]
+        subject = rng.choice(SUBJECTS)
+        concept = rng.choice(CONCEPTS)
+        question = rng.choice(QUESTION_TEMPLATES).format(concept=concept, subject=subject)
+        choice_count = rng.choice((2, 3, 4, 4, 4, 5))
+        choices = [
+            template.format(concept=rng.choice(CONCEPTS))
+            for template in rng.sample(CHOICE_TEMPLATES, choice_count)
+        ]
+        correct_index = rng.randrange(choice_count)
+        answer_key.append((choice_count, correct_index))
+        yield (quiz_id, topic_id, question, json.dumps(choices), correct_index)
+
+
+def generate_submissions(rng, count, answer_key, user_count, skew, start, end):
+    # Popular quizzes and heavy users are spread over the id range
+    quiz_ids = list(range(1, len(answer_key) + 1))
+    rng.shuffle(quiz_ids)
+    quiz_weights = zipf_cum_weights(len(quiz_ids), skew)
+    user_ids = list(range(1, user_count + 1))
+    rng.shuffle(user_ids)
+    user_weights = zipf_cum_weights(user_count, skew)
+    user_skill = [rng.betavariate(4, 3) for _ in range(user_count + 1)]
+
+    start_ts = start.timestamp()
+    span = end.timestamp() - start_ts
+    produced = 0
+    while produced < count:
+        size = min(SAMPLE_CHUNK_SIZE, count - produced)
+        quizzes = rng.choices(quiz_ids, cum_weights=quiz_weights, k=size)
+        users = rng.choices(user_ids, cum_weights=user_weights, k=size)
+        for quiz_id, user_id in zip(quizzes, users):
+            produced += 1
+            choice_count, correct_index = answer_key[quiz_id - 1]
+            if rng.random() < user_skill[user_id]:
+                selected_index = correct_index
+            else:
+                selected_index = rng.randrange(choice_count)
+            is_correct = selected_index == correct_index
+            created_at = datetime.fromtimestamp(start_ts + rng.random() * span, timezone.utc)
+            yield (
+                produced,
+                created_at.isoformat(),
+                f"user_{user_id:06d}",
+                selected_index,
+                "t" if is_correct else "f",
+                1 if is_correct else 0,
+                quiz_id,
+            )
+
+
+def reset_sequences(connection):
+    cursor = connection.cursor()
+    for table in ("topics", "quizzes", "submissions"):
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        )
+    cursor.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a deterministic, production-scale dataset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--quizzes", type=int, default=1000000)
+    parser.add_argument("--submissions", type=int, default=10000000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent for topic size, quiz popularity and user activity")
+    parser.add_argument("--months", type=int, default=6,
+                        help="Spread submissions over this many months before --end-date")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE,
+                        help=f"Latest submission date, YYYY-MM-DD (default: {DEFAULT_END_DATE})")
+    parser.add_argument("--batch-size", type=int, default=COPY_BATCH_SIZE, help="Rows per COPY batch")
+    parser.add_argument("--truncate", action="store_true", help="Empty existing tables first")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    print_banner()
+    args = parse_args()
+    if min(args.topics, args.quizzes, args.users) < 1 or args.submissions < 0:
+        print("❌ --topics, --quizzes and --users must be at least 1")
+        sys.exit(1)
+
+    end = datetime(args.end_date.year, args.end_date.month, args.end_date.day, tzinfo=timezone.utc) + timedelta(days=1)
+    start = datetime.combine(partitions.add_months(partitions.month_start(end), -args.months),
+                             datetime.min.time(), timezone.utc)
+
+    # Partitions must cover every generated timestamp, including a future --end-date
+    end_month = partitions.month_start(end)
+    current_month = partitions.month_start()
+    months_ahead = (end_month.year - current_month.year) * 12 + end_month.month - current_month.month
+    models.Base.metadata.create_all(bind=engine)
+    partitions.ensure_partitions(engine, months_ahead=max(partitions.MONTHS_AHEAD, months_ahead), start=start)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.truncate:
+            cursor.execute("TRUNCATE submissions, quizzes, topics RESTART IDENTITY CASCADE")
+        else:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM topics)")
+            if cursor.fetchone()[0]:
+                print("❌ Database already contains data. Re-run with --truncate to replace it.")
+                sys.exit(1)
+        cursor.close()
+
+        rng = random.Random(args.seed)
+        started = time.time()
+        print(f"Seed {args.seed}: {args.topics:,} topics, {args.quizzes:,} quizzes, "
+              f"{args.submissions:,} submissions from {start.date()} to {args.end_date}\n")
+
+        copy_rows(connection, "topics", ("id", "title", "description"),
+                  generate_topics(rng, args.topics), args.batch_size)
+
+        # Kept in memory to grade the generated submissions
+        answer_key = []
+        copy_rows(connection, "quizzes", ("id", "topic_id", "question", "choices", "correct_index"),
+                  generate_quizzes(rng, args.quizzes, args.topics, args.skew, answer_key),
+                  args.batch_size)
+
+        copy_rows(connection, "submissions",
+                  ("id", "created_at", "user_name", "selected_index", "is_correct", "score", "quiz_id"),
+                  generate_submissions(rng, args.submissions, answer_key, args.users, args.skew,
+                                       start, end),
+                  args.batch_size)
+
+        reset_sequences(connection)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    # Refresh planner statistics for the freshly loaded tables
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE topics, quizzes, submissions"))
+
+    print(f"\n🎉 Dataset generated in {time.time() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
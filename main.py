@@ -1,19 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, WebSocket
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-import models, schemas, crud
+import models, schemas, crud, partitions, admission, quiz_sessions
 from database import engine, SessionLocal
 import pandas as pd
+import asyncio
 import io
 import os
 from pathlib import Path
 
-# Create all database tables
+# Create all database tables and the monthly submission partitions
 models.Base.metadata.create_all(bind=engine)
+partitions.ensure_partitions(engine)
 
 app = FastAPI(title="PySQL Gym 🧠", description="Learn Python and SQL through interactive quizzes!")
 
+# Rate limits and concurrency caps for the write endpoints (see admission.py)
+app.add_middleware(admission.AdmissionMiddleware, controller=admission.controller)
+
 # Get the current directory and static path for Windows compatibility
 current_dir = Path(__file__).parent
 static_dir = current_dir / "static"
@@ -41,6 +47,36 @@ def debug_static_files():
         "files": static_files
     }
 
+# Admission control counters (rate limited / queued / rejected requests)
+@app.get("/debug/admission")
+def debug_admission():
+    """Debug endpoint to inspect rate limiting and write lane saturation"""
+    return admission.controller.stats()
+
+
+# Keep future submission partitions created while the server is running
+async def refresh_partitions_daily():
+    while True:
+        await asyncio.sleep(24 * 60 * 60)
+        try:
+            await run_in_threadpool(partitions.ensure_partitions, engine)
+        except Exception as e:
+            print(f"⚠️  Failed to create submission partitions: {e}")
+
+
+@app.on_event("startup")
+async def start_partition_maintenance():
+    # Keep a strong reference; asyncio only holds tasks weakly
+    app.state.partition_task = asyncio.create_task(refresh_partitions_daily())
+
+
+@app.on_event("shutdown")
+async def stop_partition_maintenance():
+    task = getattr(app.state, "partition_task", None)
+    if task is not None:
+        task.cancel()
+
+
 # Dependency for DB session
 def get_db():
     db = SessionLocal()
@@ -98,6 +134,42 @@ def read_quizzes_by_topic(topic_id: int, db: Session = Depends(get_db)):
     return crud.get_quizzes_by_topic(db, topic_id=topic_id)
 
 
+# Must be registered before /api/quizzes/{quiz_id}
+@app.get("/api/quizzes/search", response_model=schemas.QuizSearchResponse)
+def search_quizzes(
+    q: str = Query(..., min_length=1, max_length=200),
+    topic_id: int = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search over questions and choices (prefix matching, keyset pagination)"""
+    after_rank = after_id = None
+    if cursor:
+        try:
+            rank_part, id_part = cursor.split(":")
+            after_rank, after_id = float(rank_part), int(id_part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        rows = crud.search_quizzes(
+            db, q, topic_id=topic_id, limit=limit, after_rank=after_rank, after_id=after_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(rows) == limit:
+        last_quiz, last_rank = rows[-1]
+        next_cursor = f"{last_rank!r}:{last_quiz.id}"
+
+    return {
+        "results": [{"quiz": quiz, "rank": rank} for quiz, rank in rows],
+        "next_cursor": next_cursor,
+    }
+
+
 @app.get("/api/quizzes/{quiz_id}", response_model=schemas.Quiz)
 def read_quiz(quiz_id: int, db: Session = Depends(get_db)):
     quiz = crud.get_quiz(db, quiz_id=quiz_id)
@@ -109,7 +181,10 @@ def read_quiz(quiz_id: int, db: Session = Depends(get_db)):
 # 🧾 SUBMISSION ENDPOINTS
 @app.post("/api/submissions/", response_model=schemas.Submission)
 def create_submission(submission: schemas.SubmissionCreate, db: Session = Depends(get_db)):
-    db_submission = crud.create_submission(db=db, submission=submission)
+    try:
+        db_submission = crud.create_submission(db=db, submission=submission)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if db_submission is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
     return db_submission
@@ -120,6 +195,13 @@ def read_submissions(db: Session = Depends(get_db)):
     return crud.get_submissions(db)
 
 
+# ⚡ LIVE QUIZ SESSION (WebSocket)
+@app.websocket("/ws/quiz/{topic_id}")
+async def live_quiz_session(websocket: WebSocket, topic_id: int):
+    """Stream questions, grade answers in memory and store them in one batch (see quiz_sessions.py)"""
+    await quiz_sessions.run_session(websocket, topic_id)
+
+
 # 🎯 Initialize with sample data
 @app.post("/api/init-data/")
 def initialize_sample_data(db: Session = Depends(get_db)):
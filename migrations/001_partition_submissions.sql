@@ -0,0 +1,52 @@
+-- Convert an existing, unpartitioned submissions table into the monthly
+-- range-partitioned layout used by models.Submission.
+--
+-- Fresh databases do not need this: main.py creates the partitioned table.
+-- Existing rows have no timestamp, so they are stamped with the migration
+-- time and land in the current month's partition.
+--
+-- Run with: psql -d pysql_gym -f migrations/001_partition_submissions.sql
+-- then:     python partitions.py ensure
+
+BEGIN;
+
+ALTER TABLE submissions RENAME TO submissions_legacy;
+ALTER TABLE submissions_legacy RENAME CONSTRAINT submissions_pkey TO submissions_legacy_pkey;
+ALTER TABLE submissions_legacy RENAME CONSTRAINT submissions_quiz_id_fkey TO submissions_legacy_quiz_id_fkey;
+ALTER INDEX IF EXISTS ix_submissions_id RENAME TO ix_submissions_legacy_id;
+
+CREATE TABLE submissions (
+    id INTEGER NOT NULL DEFAULT nextval('submissions_id_seq'),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    user_name VARCHAR,
+    selected VARCHAR,
+    is_correct BOOLEAN,
+    score INTEGER,
+    quiz_id INTEGER REFERENCES quizzes (id),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE submissions_id_seq OWNED BY submissions.id;
+CREATE INDEX ix_submissions_id ON submissions (id);
+CREATE INDEX ix_submissions_created_at ON submissions (created_at);
+
+DO $$
+DECLARE
+    month_start DATE := date_trunc('month', now() AT TIME ZONE 'UTC')::date;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF submissions FOR VALUES FROM (%L) TO (%L)',
+        'submissions_' || to_char(month_start, 'YYYY_MM'),
+        month_start::text || ' 00:00:00+00',
+        (month_start + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+    );
+END
+$$;
+
+INSERT INTO submissions (id, created_at, user_name, selected, is_correct, score, quiz_id)
+SELECT id, now(), user_name, selected, is_correct, score, quiz_id
+FROM submissions_legacy;
+
+DROP TABLE submissions_legacy;
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Add the generated full-text search column and its GIN index to an
+-- existing quizzes table. Fresh databases get both from models.Quiz.
+--
+-- Run with: psql -d pysql_gym -f migrations/002_quiz_search_vector.sql
+
+BEGIN;
+
+ALTER TABLE quizzes ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(question, '')), 'A') ||
+    setweight(json_to_tsvector('english', coalesce(choices, '[]'::json), '["string"]'), 'B')
+) STORED;
+
+COMMIT;
+
+-- Built outside the transaction so writes are not blocked on a large bank
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_quizzes_search_vector
+    ON quizzes USING gin (search_vector);
@@ -0,0 +1,111 @@
+-- Compact quiz storage: choices as JSONB, the correct answer as a choice
+-- index, and submissions storing the selected index instead of the full
+-- answer text. Fresh databases get this layout from models.py.
+--
+-- Both tables are rewritten rather than updated in place, so the old answer
+-- text is actually gone from disk afterwards (an UPDATE + DROP COLUMN would
+-- leave every old row version and the dropped text behind, and plain VACUUM
+-- does not shrink the files):
+--   - quizzes is rewritten by the final ALTER COLUMN ... TYPE jsonb, which
+--     runs after correct_answer has been dropped
+--   - every submissions partition is detached, copied into a fresh partition
+--     with INSERT ... SELECT, and the old one is dropped
+--
+-- Quizzes whose correct_answer is not one of their choices cannot be
+-- converted; the migration aborts and lists them so they can be fixed first.
+-- Submissions whose answer is not one of the choices get a NULL
+-- selected_index (they were graded as incorrect anyway).
+--
+-- The whole migration runs in one transaction and locks both tables; run it
+-- during a maintenance window.
+--
+-- Run with: psql -d pysql_gym -f migrations/003_compact_quiz_storage.sql
+
+BEGIN;
+
+-- Quizzes ------------------------------------------------------------------
+
+-- The generated search column depends on choices; it is re-added below
+ALTER TABLE quizzes DROP COLUMN IF EXISTS search_vector;
+
+ALTER TABLE quizzes ADD COLUMN correct_index SMALLINT;
+UPDATE quizzes q
+SET correct_index = (
+    SELECT e.ord - 1
+    FROM json_array_elements_text(q.choices) WITH ORDINALITY AS e(choice, ord)
+    WHERE e.choice = q.correct_answer
+    ORDER BY e.ord
+    LIMIT 1
+);
+
+DO $$
+DECLARE
+    bad_ids TEXT;
+BEGIN
+    SELECT string_agg(id::text, ', ') INTO bad_ids FROM quizzes WHERE correct_index IS NULL;
+    IF bad_ids IS NOT NULL THEN
+        RAISE EXCEPTION 'correct_answer is not one of the choices for quizzes: %', bad_ids;
+    END IF;
+END
+$$;
+
+ALTER TABLE quizzes ALTER COLUMN correct_index SET NOT NULL;
+ALTER TABLE quizzes DROP COLUMN correct_answer;
+
+-- Rewrites the table: drops the old row versions and the dropped column's data
+ALTER TABLE quizzes ALTER COLUMN choices TYPE JSONB USING choices::jsonb;
+
+ALTER TABLE quizzes ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(question, '')), 'A') ||
+    setweight(jsonb_to_tsvector('english', coalesce(choices, '[]'::jsonb), '["string"]'), 'B')
+) STORED;
+CREATE INDEX ix_quizzes_search_vector ON quizzes USING gin (search_vector);
+
+-- Submissions --------------------------------------------------------------
+
+CREATE TEMPORARY TABLE old_submission_partitions ON COMMIT DROP AS
+SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'submissions'::regclass;
+
+DO $$
+DECLARE
+    part RECORD;
+BEGIN
+    FOR part IN SELECT name FROM old_submission_partitions LOOP
+        EXECUTE format('ALTER TABLE submissions DETACH PARTITION %I', part.name);
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', part.name, part.name || '_old');
+    END LOOP;
+END
+$$;
+
+-- The parent is empty now, so changing its columns is instant
+ALTER TABLE submissions ADD COLUMN selected_index SMALLINT;
+ALTER TABLE submissions DROP COLUMN selected;
+
+DO $$
+DECLARE
+    part RECORD;
+BEGIN
+    FOR part IN SELECT name, bound FROM old_submission_partitions LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF submissions %s', part.name, part.bound);
+        EXECUTE format(
+            'INSERT INTO %I (id, created_at, user_name, selected_index, is_correct, score, quiz_id) '
+            'SELECT s.id, s.created_at, s.user_name, '
+            '       (SELECT e.ord - 1 '
+            '        FROM jsonb_array_elements_text(q.choices) WITH ORDINALITY AS e(choice, ord) '
+            '        WHERE e.choice = s.selected ORDER BY e.ord LIMIT 1), '
+            '       s.is_correct, s.score, s.quiz_id '
+            'FROM %I s LEFT JOIN quizzes q ON q.id = s.quiz_id',
+            part.name, part.name || '_old'
+        );
+        EXECUTE format('DROP TABLE %I', part.name || '_old');
+    END LOOP;
+END
+$$;
+
+COMMIT;
+
+ANALYZE quizzes;
+ANALYZE submissions;
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, String, ForeignKey, Boolean, DateTime, Computed, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 
 class Topic(Base):
@@ -13,23 +14,49 @@ class Topic(Base):
 
 class Quiz(Base):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        Index("ix_quizzes_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     question = Column(String)
-    choices = Column(JSON)  # Store multiple choice options as JSON
-    correct_answer = Column(String)
+    choices = Column(JSONB)  # Store multiple choice options as a JSONB array
+    correct_index = Column(SmallInteger, nullable=False)  # Position of the correct choice
     topic_id = Column(Integer, ForeignKey("topics.id"))
+    # Full-text search document: question text (weight A) plus choices (weight B).
+    # Deferred so regular quiz loads don't fetch it.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(question, '')), 'A') || "
+        "setweight(jsonb_to_tsvector('english', coalesce(choices, '[]'::jsonb), '[\"string\"]'), 'B')",
+        persisted=True,
+    )))
 
     topic = relationship("Topic", back_populates="quizzes")
     submissions = relationship("Submission", back_populates="quiz")
 
+    @property
+    def correct_answer(self):
+        return self.choices[self.correct_index]
+
 
 class Submission(Base):
     __tablename__ = "submissions"
-    id = Column(Integer, primary_key=True, index=True)
+    # Range-partitioned by month on created_at (see partitions.py); the
+    # partition key has to be part of the primary key.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, index=True, server_default=func.now(), nullable=False)
     user_name = Column(String)
-    selected = Column(String)  # User's selected answer
+    selected_index = Column(SmallInteger)  # Position of the user's choice, NULL if not one of the choices
     is_correct = Column(Boolean)
     score = Column(Integer, default=0)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"))
 
     quiz = relationship("Quiz", back_populates="submissions")
+
+    @property
+    def selected(self):
+        if self.selected_index is None:
+            return None
+        return self.quiz.choices[self.selected_index]
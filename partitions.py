@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Submission partition management
+
+The submissions table is range-partitioned by month on created_at. This module
+creates the monthly partitions ahead of time and archives old ones: an expired
+partition is detached, exported to a gzipped CSV file and dropped, so queries
+on submissions only ever touch recent data.
+
+Usage:
+    python partitions.py ensure [--months-ahead 3]
+    python partitions.py archive [--retention-months 12] [--output-dir archive] [--keep-table]
+"""
+
+import argparse
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from database import engine
+
+PARENT_TABLE = "submissions"
+PARTITION_NAME_RE = re.compile(r"^submissions_(\d{4})_(\d{2})$")
+
+MONTHS_AHEAD = int(os.getenv("SUBMISSION_PARTITION_MONTHS_AHEAD", "3"))
+RETENTION_MONTHS = int(os.getenv("SUBMISSION_RETENTION_MONTHS", "12"))
+ARCHIVE_DIR = os.getenv("SUBMISSION_ARCHIVE_DIR", "archive")
+
+
+def month_start(value=None):
+    """Return the first day of the (UTC) month containing value"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    """Shift a first-of-month date by count months"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_{month.year:04d}_{month.month:02d}"
+
+
+def ensure_partitions(bind=engine, months_ahead=MONTHS_AHEAD, start=None):
+    """
+    Create the monthly partitions from start (default: the current month)
+    through months_ahead months in the future. Existing partitions are left
+    untouched. Returns the names of the partitions that were checked.
+    """
+    first = month_start(start)
+    last = add_months(month_start(), months_ahead)
+    names = []
+    with bind.begin() as conn:
+        month = first
+        while month <= last:
+            name = partition_name(month)
+            upper = add_months(month, 1)
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{upper.isoformat()} 00:00:00+00')"
+            ))
+            names.append(name)
+            month = upper
+    return names
+
+
+def _partition_month(name):
+    match = PARTITION_NAME_RE.match(name)
+    if match:
+        return date(int(match.group(1)), int(match.group(2)), 1)
+    return None
+
+
+def _list_monthly_tables(bind):
+    """
+    Return (month, name, state) for every monthly table, oldest first. state is
+    "attached", "detach_pending" (an interrupted DETACH ... CONCURRENTLY) or
+    "detached" (a standalone table left behind by an earlier archive run).
+    """
+    with bind.connect() as conn:
+        pending = "pg_inherits.inhdetachpending" if conn.dialect.server_version_info >= (14,) else "false"
+        children = conn.execute(text(
+            f"SELECT child.relname, {pending} FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ), {"parent": PARENT_TABLE}).all()
+        standalone = conn.execute(text(
+            "SELECT c.relname FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind = 'r' AND NOT c.relispartition "
+            "AND n.nspname = current_schema() AND c.relname LIKE :pattern"
+        ), {"pattern": f"{PARENT_TABLE}\\_%"}).scalars().all()
+
+    tables = [(name, "detach_pending" if is_pending else "attached") for name, is_pending in children]
+    tables += [(name, "detached") for name in standalone]
+
+    monthly = []
+    for name, state in tables:
+        month = _partition_month(name)
+        if month is not None:
+            monthly.append((month, name, state))
+    return sorted(monthly)
+
+
+def _detach(bind, name, state):
+    """
+    Detach a partition outside of any long transaction. On PostgreSQL 14+ this
+    uses DETACH ... CONCURRENTLY, so inserts and reads on submissions are not
+    blocked; older servers only hold the exclusive lock for the detach itself.
+    """
+    with bind.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        if state == "detach_pending":
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}" FINALIZE'))
+        elif conn.dialect.server_version_info >= (14,):
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}" CONCURRENTLY'))
+        else:
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+
+
+def _export(bind, name, target):
+    """Export a detached partition to a gzipped CSV file"""
+    partial = target.with_name(target.name + ".part")
+    with bind.connect() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            with gzip.open(partial, "wt", encoding="utf-8", newline="") as out:
+                cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', out)
+        finally:
+            cursor.close()
+    partial.replace(target)
+
+
+def archive_partitions(bind=engine, retention_months=RETENTION_MONTHS,
+                       output_dir=ARCHIVE_DIR, keep_table=False):
+    """
+    Detach every partition that ends before the retention window, export it
+    to <output_dir>/<partition>.csv.gz and drop it (unless keep_table is set).
+
+    Detaching, exporting and dropping are separate steps, so the long export
+    never holds a lock on submissions. If an export fails the detached table
+    is left in place and picked up again by the next run. Returns the paths
+    of the written files.
+    """
+    cutoff = add_months(month_start(), -retention_months)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    archived = []
+    for month, name, state in _list_monthly_tables(bind):
+        if month >= cutoff:
+            continue
+
+        target = output_path / f"{name}.csv.gz"
+        if state == "detached" and target.exists():
+            # Exported by an earlier run; only the drop may be outstanding
+            if not keep_table:
+                with bind.begin() as conn:
+                    conn.execute(text(f'DROP TABLE "{name}"'))
+            continue
+
+        if state != "detached":
+            _detach(bind, name, state)
+        _export(bind, name, target)
+
+        if not keep_table:
+            with bind.begin() as conn:
+                conn.execute(text(f'DROP TABLE "{name}"'))
+
+        archived.append(target)
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly submission partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure_cmd = commands.add_parser("ensure", help="Create current and future partitions")
+    ensure_cmd.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+
+    archive_cmd = commands.add_parser("archive", help="Detach and export expired partitions")
+    archive_cmd.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    archive_cmd.add_argument("--output-dir", default=ARCHIVE_DIR)
+    archive_cmd.add_argument("--keep-table", action="store_true",
+                             help="Keep the detached table instead of dropping it")
+
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        for name in ensure_partitions(months_ahead=args.months_ahead):
+            print(f"✅ {name}")
+    elif args.command == "archive":
+        archived = archive_partitions(
+            retention_months=args.retention_months,
+            output_dir=args.output_dir,
+            keep_table=args.keep_table,
+        )
+        for path in archived:
+            print(f"📦 Archived {path}")
+        if not archived:
+            print("Nothing to archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Hot-path queries
+
+get_quiz, get_topic and get_quizzes_by_topic run on almost every request, so
+they skip the per-call statement building of db.query(...).filter(...):
+
+- Lambda statements: SQLAlchemy caches the constructed statement and its
+  compiled SQL under the lambda's code location, so a call only extracts the
+  bound parameter values.
+- Server-side prepared statements (on by default): each statement is
+  PREPAREd once per pooled connection and run with EXECUTE, so PostgreSQL
+  skips parsing and, after a few executions, planning. Set
+  DB_SERVER_PREPARED_STATEMENTS=false when connecting through a pooler in
+  transaction mode (e.g. PgBouncer), where session state is not kept.
+"""
+
+import os
+
+from sqlalchemy import inspect, lambda_stmt, select, text
+from sqlalchemy.orm import Session
+
+from models import Quiz, Topic
+
+SERVER_PREPARED_STATEMENTS = os.getenv("DB_SERVER_PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+
+
+def _prepared_statement(name: str, entity, where_column: str):
+    """
+    Build (PREPARE sql, ORM statement running EXECUTE) for a lookup on entity.
+    The column list comes from the mapper's non-deferred columns, so it always
+    matches what a regular select(entity) would load.
+    """
+    columns = ", ".join(
+        prop.columns[0].name for prop in inspect(entity).column_attrs if not prop.deferred
+    )
+    prepare_sql = f"PREPARE {name} AS SELECT {columns} FROM {entity.__tablename__} WHERE {where_column} = $1"
+    execute_stmt = select(entity).from_statement(text(f"EXECUTE {name}(:value)"))
+    return prepare_sql, execute_stmt
+
+
+PREPARED_STATEMENTS = {
+    "hot_get_topic": _prepared_statement("hot_get_topic", Topic, "id"),
+    "hot_get_quiz": _prepared_statement("hot_get_quiz", Quiz, "id"),
+    "hot_get_quizzes_by_topic": _prepared_statement("hot_get_quizzes_by_topic", Quiz, "topic_id"),
+}
+
+
+def _execute_prepared(db: Session, name: str, value):
+    """Run a named prepared statement, preparing it first on this connection if needed"""
+    prepare_sql, execute_stmt = PREPARED_STATEMENTS[name]
+    connection = db.connection()
+    prepared = connection.connection.info.setdefault("prepared_statements", set())
+    if name not in prepared:
+        connection.exec_driver_sql(prepare_sql)
+        prepared.add(name)
+    return db.execute(execute_stmt, {"value": value}).scalars()
+
+
+# Lambda statement implementations
+
+def get_topic_cached(db: Session, topic_id: int):
+    return db.execute(lambda_stmt(
+        lambda: select(Topic).where(Topic.id == topic_id)
+    )).scalars().first()
+
+
+def get_quiz_cached(db: Session, quiz_id: int):
+    return db.execute(lambda_stmt(
+        lambda: select(Quiz).where(Quiz.id == quiz_id)
+    )).scalars().first()
+
+
+def get_quizzes_by_topic_cached(db: Session, topic_id: int):
+    return db.execute(lambda_stmt(
+        lambda: select(Quiz).where(Quiz.topic_id == topic_id)
+    )).scalars().all()
+
+
+# Server-side prepared statement implementations
+
+def get_topic_prepared(db: Session, topic_id: int):
+    return _execute_prepared(db, "hot_get_topic", topic_id).first()
+
+
+def get_quiz_prepared(db: Session, quiz_id: int):
+    return _execute_prepared(db, "hot_get_quiz", quiz_id).first()
+
+
+def get_quizzes_by_topic_prepared(db: Session, topic_id: int):
+    return _execute_prepared(db, "hot_get_quizzes_by_topic", topic_id).all()
+
+
+def get_topic(db: Session, topic_id: int):
+    if SERVER_PREPARED_STATEMENTS:
+        return get_topic_prepared(db, topic_id)
+    return get_topic_cached(db, topic_id)
+
+
+def get_quiz(db: Session, quiz_id: int):
+    if SERVER_PREPARED_STATEMENTS:
+        return get_quiz_prepared(db, quiz_id)
+    return get_quiz_cached(db, quiz_id)
+
+
+def get_quizzes_by_topic(db: Session, topic_id: int):
+    if SERVER_PREPARED_STATEMENTS:
+        return get_quizzes_by_topic_prepared(db, topic_id)
+    return get_quizzes_by_topic_cached(db, topic_id)
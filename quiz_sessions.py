@@ -0,0 +1,228 @@
+"""
+Live quiz sessions over WebSocket
+
+A session loads a topic's questions and answer key once, then streams one
+question at a time and grades answers in memory. Nothing is written until
+the session ends (or the client disconnects), when all answers are stored
+in a single batch.
+
+Protocol (JSON messages):
+    client -> {"type": "start", "user_name": "..."}
+    server -> {"type": "question", "index": 0, "total": 3, "quiz": {"id", "question", "choices"}}
+    client -> {"type": "answer", "selected_index": 1}
+    server -> {"type": "result", "quiz_id", "selected_index", "correct_index", "correct_answer", "is_correct"}
+    ...     (question / answer / result until every question is answered)
+    server -> {"type": "summary", "score", "total"}
+    server -> {"type": "error", "detail": "..."} on invalid messages
+    server -> {"type": "error", "detail": "...", "retry_after": 5} then close (1013)
+              when the client is rate limited or the server is saturated
+
+Sessions go through the same admission control as the REST writes (see
+admission.py): a per-client rate limit on opening sessions, a cap on open
+sessions, and the shared write lane around loading and saving.
+"""
+
+import asyncio
+import json
+import math
+import os
+
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+import admission
+import crud
+from database import SessionLocal
+
+SESSION_ROUTE = "/ws/quiz/{topic_id}"
+
+# Sessions with no client message for this long are closed (their answers are kept)
+IDLE_TIMEOUT = float(os.getenv("QUIZ_SESSION_IDLE_TIMEOUT", "300"))
+
+# Write-lane attempts for storing a finished session before its answers are dropped
+SAVE_ATTEMPTS = 5
+
+
+class QuizSession:
+    """Server-side state for one quiz run: question order, answer key and answers"""
+
+    def __init__(self, user_name: str, topic_id: int, quizzes):
+        self.user_name = user_name
+        self.topic_id = topic_id
+        self.questions = [
+            {"id": quiz.id, "question": quiz.question, "choices": list(quiz.choices)}
+            for quiz in quizzes
+        ]
+        self.answer_key = {quiz.id: quiz.correct_index for quiz in quizzes}
+        self.position = 0
+        self.answers = []
+        self.saved = False
+
+    @property
+    def finished(self):
+        return self.position >= len(self.questions)
+
+    @property
+    def score(self):
+        return sum(1 for answer in self.answers if answer["is_correct"])
+
+    def question_message(self):
+        return {
+            "type": "question",
+            "index": self.position,
+            "total": len(self.questions),
+            "quiz": self.questions[self.position],
+        }
+
+    def answer(self, selected_index):
+        """Grade the current question and move on. Returns the result message"""
+        quiz = self.questions[self.position]
+        if (not isinstance(selected_index, int) or isinstance(selected_index, bool)
+                or not 0 <= selected_index < len(quiz["choices"])):
+            raise ValueError("selected_index must be the position of one of the choices")
+
+        correct_index = self.answer_key[quiz["id"]]
+        is_correct = selected_index == correct_index
+        self.answers.append({
+            "quiz_id": quiz["id"],
+            "selected_index": selected_index,
+            "is_correct": is_correct,
+        })
+        self.position += 1
+        return {
+            "type": "result",
+            "quiz_id": quiz["id"],
+            "selected_index": selected_index,
+            "correct_index": correct_index,
+            "correct_answer": quiz["choices"][correct_index],
+            "is_correct": is_correct,
+        }
+
+    def summary_message(self):
+        return {"type": "summary", "score": self.score, "total": len(self.questions)}
+
+
+def load_session(user_name: str, topic_id: int):
+    db = SessionLocal()
+    try:
+        quizzes = crud.get_quizzes_by_topic(db, topic_id=topic_id)
+        return QuizSession(user_name, topic_id, quizzes)
+    finally:
+        db.close()
+
+
+def save_session(session: QuizSession):
+    """Store every answer of the session in one transaction"""
+    if session.saved or not session.answers:
+        return
+    db = SessionLocal()
+    try:
+        crud.create_bulk_submissions(db, session.user_name, session.answers)
+        session.saved = True
+    finally:
+        db.close()
+
+
+class SessionRejected(Exception):
+    """The session could not be admitted; detail and retry_after go to the client"""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+async def _in_write_lane(func, *args, attempts=1):
+    """Run blocking DB work in the shared write lane, like the REST write endpoints"""
+    lane = admission.controller.lanes["write"]
+    for _ in range(attempts):
+        if await lane.acquire():
+            try:
+                return await run_in_threadpool(func, *args)
+            finally:
+                lane.release()
+    raise SessionRejected("Server is busy, please retry shortly", lane.retry_after)
+
+
+async def _receive_message(websocket: WebSocket):
+    """Next client message as a dict, or None if the frame isn't a JSON object"""
+    message = await asyncio.wait_for(websocket.receive(), IDLE_TIMEOUT)
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    try:
+        data = json.loads(message.get("text") or "")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def run_session(websocket: WebSocket, topic_id: int):
+    await websocket.accept()
+    controller = admission.controller
+    session_lane = controller.lanes["session"]
+    try:
+        policy = controller.policies[("WEBSOCKET", SESSION_ROUTE)]
+        wait = controller.check_rate("WEBSOCKET", SESSION_ROUTE, policy, controller.client_key(websocket.scope))
+        if wait:
+            raise SessionRejected("Too many quiz sessions, please slow down", max(1, math.ceil(wait)))
+        if not await session_lane.acquire():
+            raise SessionRejected("Too many live quiz sessions, please retry shortly", session_lane.retry_after)
+    except SessionRejected as e:
+        await websocket.send_json({"type": "error", "detail": e.detail, "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+        return
+
+    try:
+        await _run_admitted_session(websocket, topic_id)
+    finally:
+        session_lane.release()
+
+
+async def _run_admitted_session(websocket: WebSocket, topic_id: int):
+    session = None
+    try:
+        start = await _receive_message(websocket)
+        user_name = str(start.get("user_name", "")).strip() if start else ""
+        if not start or start.get("type") != "start" or not user_name:
+            await websocket.send_json({"type": "error", "detail": "Expected a start message with user_name"})
+            await websocket.close(code=1008)
+            return
+
+        session = await _in_write_lane(load_session, user_name, topic_id)
+        if not session.questions:
+            await websocket.send_json({"type": "error", "detail": "No quizzes available for this topic yet."})
+            await websocket.close()
+            return
+
+        await websocket.send_json(session.question_message())
+        while not session.finished:
+            message = await _receive_message(websocket)
+            if not message or message.get("type") != "answer":
+                await websocket.send_json({"type": "error", "detail": "Expected an answer message"})
+                continue
+            try:
+                result = session.answer(message.get("selected_index"))
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json(result)
+            if not session.finished:
+                await websocket.send_json(session.question_message())
+
+        await _in_write_lane(save_session, session, attempts=SAVE_ATTEMPTS)
+        await websocket.send_json(session.summary_message())
+        await websocket.close()
+    except SessionRejected as e:
+        await websocket.send_json({"type": "error", "detail": e.detail, "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+    except asyncio.TimeoutError:
+        await websocket.close(code=1001)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Keep whatever was answered if the session ended early
+        if session is not None and not session.saved:
+            try:
+                await _in_write_lane(save_session, session, attempts=SAVE_ATTEMPTS)
+            except SessionRejected:
+                print(f"⚠️  Dropped {len(session.answers)} answers from {session.user_name}: write lane saturated")
@@ -1,17 +1,40 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, root_validator
 from typing import List, Optional
+from datetime import datetime
 
 class QuizBase(BaseModel):
     question: str
     choices: List[str]
-    correct_answer: str
 
 class QuizCreate(QuizBase):
     topic_id: int
+    correct_index: Optional[int] = None
+    correct_answer: Optional[str] = None  # Accepted instead of correct_index for older clients
+
+    @root_validator(skip_on_failure=True)
+    def resolve_correct_index(cls, values):
+        choices = values.get("choices")
+        correct_index = values.get("correct_index")
+        correct_answer = values.get("correct_answer")
+        if correct_index is None:
+            if correct_answer is None:
+                raise ValueError("correct_index or correct_answer is required")
+            if correct_answer not in choices:
+                raise ValueError("correct_answer must be one of the choices")
+            correct_index = choices.index(correct_answer)
+        elif not 0 <= correct_index < len(choices):
+            raise ValueError("correct_index is out of range")
+        elif correct_answer is not None and choices[correct_index] != correct_answer:
+            raise ValueError("correct_index and correct_answer refer to different choices")
+        values["correct_index"] = correct_index
+        values["correct_answer"] = choices[correct_index]
+        return values
 
 class Quiz(QuizBase):
     id: int
     topic_id: int
+    correct_index: int
+    correct_answer: str
 
     class Config:
         orm_mode = True
@@ -34,21 +57,40 @@ class Topic(TopicBase):
 
 class SubmissionBase(BaseModel):
     user_name: str
-    selected: str
 
 class SubmissionCreate(SubmissionBase):
     quiz_id: int
+    selected_index: Optional[int] = None
+    selected: Optional[str] = None  # Accepted instead of selected_index for older clients
+
+    @root_validator(skip_on_failure=True)
+    def require_selection(cls, values):
+        if values.get("selected_index") is None and values.get("selected") is None:
+            raise ValueError("selected_index or selected is required")
+        return values
 
 class Submission(SubmissionBase):
     id: int
     quiz_id: int
+    selected_index: Optional[int] = None
+    selected: Optional[str] = None
     is_correct: bool
     score: int
+    created_at: datetime
 
     class Config:
         orm_mode = True
 
 
+class QuizSearchHit(BaseModel):
+    quiz: Quiz
+    rank: float
+
+class QuizSearchResponse(BaseModel):
+    results: List[QuizSearchHit]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to get the next page
+
+
 class BulkQuizUploadResponse(BaseModel):
     success: bool
     message: str
@@ -3,8 +3,14 @@ let currentTopic = null;
 let currentQuizzes = [];
 let currentQuizIndex = 0;
 let userAnswers = [];
+let userAnswerIndexes = [];
 let userName = '';
 
+// Live session state (WebSocket); null when using the REST path
+let liveSocket = null;
+let liveTotal = 0;
+let liveAdvancePending = false;
+
 // DOM elements
 const welcomeSection = document.getElementById('welcome-section');
 const topicsSection = document.getElementById('topics-section');
@@ -138,7 +144,116 @@ async function startQuizWithName() {
     nameModal.classList.add('hidden');
     nameInput.value = '';
     
-    await loadQuizzes(currentTopic.id);
+    // Prefer a live session; fall back to the REST endpoints if it can't be opened
+    const live = await startLiveSession(currentTopic.id);
+    if (!live) {
+        await loadQuizzes(currentTopic.id);
+    }
+}
+
+// Start a live quiz session over WebSocket.
+// Resolves true once the first question arrives, false if the session could not be started.
+function startLiveSession(topicId) {
+    closeLiveSession();
+    
+    if (!('WebSocket' in window)) {
+        return Promise.resolve(false);
+    }
+    
+    return new Promise(resolve => {
+        let started = false;
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        let socket;
+        try {
+            socket = new WebSocket(`${protocol}//${window.location.host}/ws/quiz/${topicId}`);
+        } catch (error) {
+            resolve(false);
+            return;
+        }
+        
+        socket.addEventListener('open', () => {
+            socket.send(JSON.stringify({ type: 'start', user_name: userName }));
+        });
+        
+        socket.addEventListener('message', event => {
+            const message = JSON.parse(event.data);
+            
+            if (message.type === 'question') {
+                if (!started) {
+                    started = true;
+                    liveSocket = socket;
+                    liveTotal = message.total;
+                    currentQuizzes = [];
+                    currentQuizIndex = 0;
+                    userAnswers = [];
+                    userAnswerIndexes = [];
+                    liveAdvancePending = false;
+                    currentQuizzes.push(message.quiz);
+                    showQuizSection();
+                    displayCurrentQuiz();
+                    resolve(true);
+                    return;
+                }
+                currentQuizzes[message.index] = message.quiz;
+                if (liveAdvancePending) {
+                    liveAdvancePending = false;
+                    advanceLiveQuestion();
+                }
+            } else if (message.type === 'result') {
+                const quiz = currentQuizzes[currentQuizIndex];
+                quiz.correct_answer = message.correct_answer;
+                showAnswerFeedback(quiz, userAnswers[currentQuizIndex]);
+                setTimeout(advanceLiveQuestion, 2000);
+            } else if (message.type === 'error') {
+                if (!started) {
+                    showMessage(message.detail, 'error');
+                    socket.close();
+                    // The server answered, so the REST path would fail the same way
+                    resolve(true);
+                    return;
+                }
+                console.error('Live session error:', message.detail);
+            }
+        });
+        
+        socket.addEventListener('close', () => {
+            if (!started) {
+                resolve(false);
+                return;
+            }
+            if (liveSocket === socket) {
+                liveSocket = null;
+                if (currentQuizIndex < liveTotal - 1 || userAnswers.length < liveTotal) {
+                    showMessage('Connection to the quiz session was lost.', 'error');
+                }
+            }
+        });
+    });
+}
+
+// Show the next live question, or the results after the last one
+function advanceLiveQuestion() {
+    if (currentQuizIndex >= liveTotal - 1) {
+        showResults();
+        return;
+    }
+    if (!currentQuizzes[currentQuizIndex + 1]) {
+        // Next question hasn't arrived yet
+        liveAdvancePending = true;
+        return;
+    }
+    currentQuizIndex++;
+    displayCurrentQuiz();
+}
+
+// Close the live session, if any
+function closeLiveSession() {
+    if (liveSocket) {
+        const socket = liveSocket;
+        liveSocket = null;
+        socket.close();
+    }
+    liveAdvancePending = false;
 }
 
 // Load quizzes for a topic
@@ -153,6 +268,7 @@ async function loadQuizzes(topicId) {
         
         currentQuizIndex = 0;
         userAnswers = [];
+        userAnswerIndexes = [];
         showQuizSection();
         displayCurrentQuiz();
     } catch (error) {
@@ -167,6 +283,11 @@ function showQuizSection() {
     document.getElementById('quiz-topic-title').textContent = currentTopic.title;
 }
 
+// Total number of questions in the current run
+function quizTotal() {
+    return liveSocket ? liveTotal : currentQuizzes.length;
+}
+
 // Display current quiz
 function displayCurrentQuiz() {
     const quiz = currentQuizzes[currentQuizIndex];
@@ -174,7 +295,7 @@ function displayCurrentQuiz() {
     
     container.innerHTML = `
         <div class="quiz-progress">
-            Question ${currentQuizIndex + 1} of ${currentQuizzes.length}
+            Question ${currentQuizIndex + 1} of ${quizTotal()}
         </div>
         
         <div class="quiz-card">
@@ -190,7 +311,7 @@ function displayCurrentQuiz() {
         
         <div style="text-align: center; margin-top: 2rem;">
             <button id="next-btn" class="btn btn-primary" onclick="nextQuestion()" disabled>
-                ${currentQuizIndex === currentQuizzes.length - 1 ? 'Finish Quiz' : 'Next Question'}
+                ${currentQuizIndex === quizTotal() - 1 ? 'Finish Quiz' : 'Next Question'}
             </button>
         </div>
     `;
@@ -208,6 +329,7 @@ function selectAnswer(answer, index) {
     
     // Store the answer
     userAnswers[currentQuizIndex] = answer;
+    userAnswerIndexes[currentQuizIndex] = index;
     
     // Enable next button
     document.getElementById('next-btn').disabled = false;
@@ -218,13 +340,25 @@ async function nextQuestion() {
     const currentQuiz = currentQuizzes[currentQuizIndex];
     const userAnswer = userAnswers[currentQuizIndex];
     
+    // Live session: the server grades the answer and replies with a result message
+    if (liveSocket) {
+        const nextBtn = document.getElementById('next-btn');
+        nextBtn.disabled = true;
+        nextBtn.textContent = 'Loading...';
+        liveSocket.send(JSON.stringify({
+            type: 'answer',
+            selected_index: userAnswerIndexes[currentQuizIndex]
+        }));
+        return;
+    }
+    
     // Submit the answer
     try {
         await apiCall('/api/submissions/', {
             method: 'POST',
             body: JSON.stringify({
                 user_name: userName,
-                selected: userAnswer,
+                selected_index: userAnswerIndexes[currentQuizIndex],
                 quiz_id: currentQuiz.id
             })
         });
@@ -316,13 +450,16 @@ function getScoreMessage(percentage) {
 
 // Restart current quiz
 function restartCurrentQuiz() {
+    closeLiveSession();
     currentQuizIndex = 0;
     userAnswers = [];
+    userAnswerIndexes = [];
     showNameModal();
 }
 
 // Show topics section
 function showTopicsSection() {
+    closeLiveSession();
     hideAllSections();
     topicsSection.classList.remove('hidden');
     welcomeSection.classList.remove('hidden');